@@ -1,11 +1,11 @@
 import streamlit as st
-import numpy as np
 import os
 import sys
+import time
 
 # Ensure backend logic is accessible
 sys.path.append(os.path.join(os.getcwd(), 'backend'))
-from markov_golf_engine import GolfHole
+from markov_golf_compute import expected_score, submit_category_gains
 
 st.set_page_config(page_title="Strokes Gained: You vs PGA Tour Pros", layout="wide")
 
@@ -61,12 +61,15 @@ DEFAULT_USER = {
     'putt_lag_make': 0.02, 'putt_lag_to_tapin': 0.40, 'putt_lag_to_short': 0.58, 'putt_short_make': 0.75
 }
 
+CATEGORIES = {"Off the Tee": GROUPS['tee'], "Approach Play": GROUPS['fw'] + GROUPS['rough'] + GROUPS['fb'], "Wedge Game": GROUPS['wedge_50'] + GROUPS['wedge_30'] + GROUPS['wedge_15'] + GROUPS['chip'], "Greenside Bunkers": GROUPS['sand'], "Putting": ['putt_lag_make', 'putt_lag_to_tapin', 'putt_lag_to_short', 'putt_short_make']}
+
 # --- State ---
 if 'user_stats' not in st.session_state:
     st.session_state.user_stats = DEFAULT_USER.copy()
     for k, v in DEFAULT_USER.items(): st.session_state[f"user_slider_{k}"] = float(v * 100)
 
 def on_user_slider_change(key):
+    st.session_state.pop('analysis', None)  # Stale once the stats change
     new_val = st.session_state[f"user_slider_{key}"] / 100.0
     group_key = next((g for g, keys in GROUPS.items() if key in keys), None)
     if group_key:
@@ -84,27 +87,7 @@ def on_user_slider_change(key):
     else: st.session_state.user_stats[key] = new_val
 
 def calculate_score(stats):
-    try:
-        states = ['Tee', 'Fairway', 'Rough', 'Wedge_50', 'Wedge_30', 'Wedge_15', 'Bunker_FW', 'Bunker_GS', 'Green_Fringe', 'Green_Lag', 'Green_Short', 'Green_TapIn', 'Hole']
-        s = {state: i for i, state in enumerate(states)}
-        P = np.zeros((len(states), len(states))); P[s['Hole'], s['Hole']] = 1.0
-        P[s['Tee'], s['Fairway']] = stats['tee_fairway']; P[s['Tee'], s['Rough']] = stats['tee_rough']; P[s['Tee'], s['Bunker_FW']] = stats['tee_bunker']
-        for st_n, pr in [('Fairway', 'fw_'), ('Rough', 'rough_')]:
-            P[s[st_n], s['Green_Short']] = stats[f'{pr}green_short']; P[s[st_n], s['Green_Lag']] = stats[f'{pr}green_lag']; P[s[st_n], s['Green_Fringe']] = stats[f'{pr}fringe']; P[s[st_n], s['Wedge_50']] = stats[f'{pr}wedge_50']; P[s[st_n], s['Bunker_GS']] = stats[f'{pr}bunker']
-        P[s['Bunker_FW'], s['Green_Short']] = stats['fb_green_short']; P[s['Bunker_FW'], s['Green_Lag']] = stats['fb_green_lag']; P[s['Bunker_FW'], s['Green_Fringe']] = stats['fb_fringe']; P[s['Bunker_FW'], s['Wedge_50']] = stats['fb_wedge_50']; P[s['Bunker_FW'], s['Bunker_GS']] = stats['fb_bunker']; P[s['Bunker_FW'], s['Bunker_FW']] = stats['fb_stay_in']
-        P[s['Wedge_50'], s['Green_Short']] = stats['w50_green_short']; P[s['Wedge_50'], s['Green_Lag']] = stats['w50_green_lag']; P[s['Wedge_50'], s['Green_Fringe']] = stats['w50_fringe']; P[s['Wedge_50'], s['Wedge_30']] = stats['w50_wedge_30']; P[s['Wedge_50'], s['Bunker_GS']] = stats['w50_bunker']
-        P[s['Wedge_30'], s['Green_Short']] = stats['w30_green_short']; P[s['Wedge_30'], s['Green_Lag']] = stats['w30_green_lag']; P[s['Wedge_30'], s['Green_Fringe']] = stats['w30_fringe']; P[s['Wedge_30'], s['Wedge_15']] = stats['w30_wedge_15']; P[s['Wedge_30'], s['Bunker_GS']] = stats['w30_bunker']
-        P[s['Wedge_15'], s['Green_Short']] = stats['w15_green_short']; P[s['Wedge_15'], s['Green_Lag']] = stats['w15_green_lag']; P[s['Wedge_15'], s['Green_Fringe']] = stats['w15_fringe']; P[s['Wedge_15'], s['Green_TapIn']] = stats['w15_tapin']; P[s['Wedge_15'], s['Bunker_GS']] = stats['w15_bunker']
-        P[s['Green_Fringe'], s['Green_TapIn']] = stats['chip_tapin']; P[s['Green_Fringe'], s['Green_Short']] = stats['chip_short']; P[s['Green_Fringe'], s['Green_Lag']] = stats['chip_lag']
-        P[s['Bunker_GS'], s['Green_Short']] = stats['sand_green_short']; P[s['Bunker_GS'], s['Green_Lag']] = stats['sand_green_lag']; P[s['Bunker_GS'], s['Green_Fringe']] = stats['sand_fringe']; P[s['Bunker_GS'], s['Bunker_GS']] = stats['sand_bunker']; P[s['Bunker_GS'], s['Rough']] = stats['sand_rough']
-        P[s['Green_Lag'], s['Hole']] = stats['putt_lag_make']; P[s['Green_Lag'], s['Green_TapIn']] = stats['putt_lag_to_tapin']; P[s['Green_Lag'], s['Green_Short']] = stats['putt_lag_to_short']
-        P[s['Green_Short'], s['Hole']] = stats['putt_short_make']; P[s['Green_Short'], s['Green_TapIn']] = 1.0 - stats['putt_short_make']
-        P[s['Green_TapIn'], s['Hole']] = 0.99; P[s['Green_TapIn'], s['Green_TapIn']] = 0.01
-        for i in range(len(states)):
-            if i != s['Hole']:
-                row_sum = P[i].sum()
-                if row_sum > 0: P[i] /= row_sum
-        return GolfHole(states, P).calculate_expected_steps('Tee')
+    try: return expected_score(stats)
     except Exception: return 0.0
 
 # --- Helper Rendering ---
@@ -158,15 +141,18 @@ st.markdown("---")
 st.markdown(f"<div style='text-align: center; padding: 20px; background: #111827; border-radius: 50px; color: white;'><span style='font-size: 14px; text-transform: uppercase; letter-spacing: 2px; color: #9ca3af;'>Your Strokes Gained</span><br/><span style='font-size: 48px; font-weight: 900;'>{pga_score - user_score:.2f}</span></div>", unsafe_allow_html=True)
 
 if st.button("🚀 Analyze My Game", use_container_width=True):
+    # One pooled future per category; the script thread never blocks on them
+    st.session_state.analysis = submit_category_gains(dict(st.session_state.user_stats), DEFAULT_PRO, CATEGORIES)
+    st.session_state.analysis_fresh = True
+
+if 'analysis' in st.session_state:
     st.markdown("### 📊 Comprehensive Performance Analysis")
-    cats = {"Off the Tee": GROUPS['tee'], "Approach Play": GROUPS['fw'] + GROUPS['rough'] + GROUPS['fb'], "Wedge Game": GROUPS['wedge_50'] + GROUPS['wedge_30'] + GROUPS['wedge_15'] + GROUPS['chip'], "Greenside Bunkers": GROUPS['sand'], "Putting": ['putt_lag_make', 'putt_lag_to_tapin', 'putt_lag_to_short', 'putt_short_make']}
-    pots = []
-    for name, keys in cats.items():
-        stats = st.session_state.user_stats.copy()
-        for k in keys: stats[k] = DEFAULT_PRO.get(k, 0.88)
-        gain = user_score - calculate_score(stats)
-        pots.append((name, gain))
-    pots.sort(key=lambda x: x[1], reverse=True)
+    futures = st.session_state.analysis
+    if not all(f.done() for _, f in futures):
+        with st.spinner(f"Analyzing... {sum(f.done() for _, f in futures)}/{len(futures)} categories solved"):
+            time.sleep(0.05)
+        st.rerun()
+    pots = sorted(((name, f.result()) for name, f in futures), key=lambda x: x[1], reverse=True)
     ca, cb = st.columns([2, 1])
     with ca:
         for i, (name, gain) in enumerate(pots):
@@ -180,4 +166,4 @@ if st.button("🚀 Analyze My Game", use_container_width=True):
         if top_l[1] > 0:
             st.error(f"**Biggest Opportunity:** Focus your practice on **{top_l[0]}**.")
             st.info(f"**Goal:** Closing just 20% of this gap saves **{top_l[1] * 0.2:.2f} strokes** per hole.")
-    st.balloons()
+    if st.session_state.pop('analysis_fresh', False): st.balloons()
@@ -0,0 +1,200 @@
+import numpy as np
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from markov_golf_engine import GolfHole
+
+"""
+SHARED COMPUTE LAYER FOR THE STREAMLIT APP
+Process-wide, thread-safe memoization of the granular 13-state model so that
+Streamlit reruns (one per slider drag, across every session on the box) do not
+rebuild and invert the same matrices over and over.
+
+- The transition matrix template is compiled once into index arrays.
+- Expected scores are cached in a bounded LRU keyed by the stat vector.
+- "Analyze My Game" category replacements run on a shared worker pool, one
+  task per category, and their futures are cached, so concurrent identical
+  requests share one solve.
+"""
+
+STATES = [
+    'Tee', 'Fairway', 'Rough', 'Wedge_50', 'Wedge_30', 'Wedge_15', 'Bunker_FW',
+    'Bunker_GS', 'Green_Fringe', 'Green_Lag', 'Green_Short', 'Green_TapIn', 'Hole'
+]
+_s = {state: i for i, state in enumerate(STATES)}
+
+# (from_state, to_state, stat_key) for every slider-driven transition
+_TEMPLATE = [
+    ('Tee', 'Fairway', 'tee_fairway'), ('Tee', 'Rough', 'tee_rough'), ('Tee', 'Bunker_FW', 'tee_bunker'),
+    *[(st_n, to, f'{pr}{key}') for st_n, pr in [('Fairway', 'fw_'), ('Rough', 'rough_')] for to, key in [
+        ('Green_Short', 'green_short'), ('Green_Lag', 'green_lag'), ('Green_Fringe', 'fringe'),
+        ('Wedge_50', 'wedge_50'), ('Bunker_GS', 'bunker')]],
+    ('Bunker_FW', 'Green_Short', 'fb_green_short'), ('Bunker_FW', 'Green_Lag', 'fb_green_lag'),
+    ('Bunker_FW', 'Green_Fringe', 'fb_fringe'), ('Bunker_FW', 'Wedge_50', 'fb_wedge_50'),
+    ('Bunker_FW', 'Bunker_GS', 'fb_bunker'), ('Bunker_FW', 'Bunker_FW', 'fb_stay_in'),
+    ('Wedge_50', 'Green_Short', 'w50_green_short'), ('Wedge_50', 'Green_Lag', 'w50_green_lag'),
+    ('Wedge_50', 'Green_Fringe', 'w50_fringe'), ('Wedge_50', 'Wedge_30', 'w50_wedge_30'),
+    ('Wedge_50', 'Bunker_GS', 'w50_bunker'),
+    ('Wedge_30', 'Green_Short', 'w30_green_short'), ('Wedge_30', 'Green_Lag', 'w30_green_lag'),
+    ('Wedge_30', 'Green_Fringe', 'w30_fringe'), ('Wedge_30', 'Wedge_15', 'w30_wedge_15'),
+    ('Wedge_30', 'Bunker_GS', 'w30_bunker'),
+    ('Wedge_15', 'Green_Short', 'w15_green_short'), ('Wedge_15', 'Green_Lag', 'w15_green_lag'),
+    ('Wedge_15', 'Green_Fringe', 'w15_fringe'), ('Wedge_15', 'Green_TapIn', 'w15_tapin'),
+    ('Wedge_15', 'Bunker_GS', 'w15_bunker'),
+    ('Green_Fringe', 'Green_TapIn', 'chip_tapin'), ('Green_Fringe', 'Green_Short', 'chip_short'),
+    ('Green_Fringe', 'Green_Lag', 'chip_lag'),
+    ('Bunker_GS', 'Green_Short', 'sand_green_short'), ('Bunker_GS', 'Green_Lag', 'sand_green_lag'),
+    ('Bunker_GS', 'Green_Fringe', 'sand_fringe'), ('Bunker_GS', 'Bunker_GS', 'sand_bunker'),
+    ('Bunker_GS', 'Rough', 'sand_rough'),
+    ('Green_Lag', 'Hole', 'putt_lag_make'), ('Green_Lag', 'Green_TapIn', 'putt_lag_to_tapin'),
+    ('Green_Lag', 'Green_Short', 'putt_lag_to_short'),
+    ('Green_Short', 'Hole', 'putt_short_make'),
+]
+
+# Compiled template: stat keys in a fixed order plus flat row/col index arrays
+STAT_KEYS = [key for _, _, key in _TEMPLATE]
+_ROWS = np.array([_s[f] for f, _, _ in _TEMPLATE])
+_COLS = np.array([_s[t] for _, t, _ in _TEMPLATE])
+_SHORT_MAKE = STAT_KEYS.index('putt_short_make')
+
+_BASE = np.zeros((len(STATES), len(STATES)))
+_BASE[_s['Hole'], _s['Hole']] = 1.0
+_BASE[_s['Green_TapIn'], _s['Hole']] = 0.99  # Nearly automatic
+_BASE[_s['Green_TapIn'], _s['Green_TapIn']] = 0.01
+
+SCORE_CACHE_SIZE = 4096
+ANALYSIS_CACHE_SIZE = 1024
+MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="golf-compute")
+_cache_lock = threading.Lock()
+_score_cache: "OrderedDict[Tuple[float, ...], float]" = OrderedDict()
+_analysis_cache: "OrderedDict[tuple, Future]" = OrderedDict()
+
+
+def stats_key(stats: Dict[str, float]) -> Tuple[float, ...]:
+    """Hashable cache key for a stats dict (only the keys the model reads)."""
+    return tuple(float(stats[k]) for k in STAT_KEYS)
+
+
+def build_transition_matrix(key: Tuple[float, ...]) -> np.ndarray:
+    """Fill the compiled template and normalize every non-absorbing row."""
+    P = _BASE.copy()
+    P[_ROWS, _COLS] = key
+    P[_s['Green_Short'], _s['Green_TapIn']] = 1.0 - key[_SHORT_MAKE]
+    row_sums = P.sum(axis=1, keepdims=True)
+    scale = (row_sums > 0) & (np.arange(len(STATES)) != _s['Hole'])[:, None]
+    return np.divide(P, row_sums, out=P, where=scale)
+
+
+def _lru_put(cache: OrderedDict, key, value, max_size: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def expected_score(stats: Dict[str, float]) -> float:
+    """Expected strokes from the Tee, memoized process-wide with LRU eviction."""
+    key = stats_key(stats)
+    with _cache_lock:
+        if key in _score_cache:
+            _score_cache.move_to_end(key)
+            return _score_cache[key]
+    score = GolfHole(STATES, build_transition_matrix(key)).calculate_expected_steps('Tee')
+    with _cache_lock:
+        _lru_put(_score_cache, key, score, SCORE_CACHE_SIZE)
+    return score
+
+
+def _safe_score(stats: Dict[str, float]) -> float:
+    # Degenerate stats (e.g. a row that never leaves a state) score 0.0, as in app.py's calculate_score
+    try: return expected_score(stats)
+    except Exception: return 0.0
+
+
+def _category_gain(user_stats: Dict[str, float], replaced_stats: Dict[str, float]) -> float:
+    return _safe_score(user_stats) - _safe_score(replaced_stats)
+
+
+def submit_category_gains(user_stats: Dict[str, float], pro_stats: Dict[str, float],
+                          categories: Dict[str, List[str]]) -> List[Tuple[str, Future]]:
+    """
+    Schedule the "move one category to PGA level" analysis on the worker pool,
+    one task per category so the categories solve in parallel.
+    Returns [(category, Future resolving to strokes gained), ...] in category order.
+    Identical in-flight or completed category solves share the same Future.
+    """
+    user_key = stats_key(user_stats)
+    futures = []
+    with _cache_lock:
+        for name, keys in categories.items():
+            replaced = dict(user_stats)
+            for k in keys: replaced[k] = pro_stats[k]
+            key = (user_key, stats_key(replaced))
+            future = _analysis_cache.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = _executor.submit(_category_gain, dict(user_stats), replaced)
+            _lru_put(_analysis_cache, key, future, ANALYSIS_CACHE_SIZE)
+            futures.append((name, future))
+    return futures
+
+
+def clear_caches():
+    with _cache_lock:
+        _score_cache.clear()
+        _analysis_cache.clear()
+
+
+if __name__ == "__main__":
+    # Rerun latency benchmark: the work app.py does per slider drag (baseline + user score)
+    # and per "Analyze My Game" click. "before" is app.py's original per-rerun calculate_score,
+    # which rebuilt every matrix entry by hand and inverted it on the script thread.
+    rng = np.random.default_rng(0)
+    pro = {k: float(v) for k, v in zip(STAT_KEYS, rng.uniform(0.05, 0.9, len(STAT_KEYS)))}
+    user = {k: float(v) for k, v in zip(STAT_KEYS, rng.uniform(0.05, 0.9, len(STAT_KEYS)))}
+    cats = {
+        "Off the Tee": STAT_KEYS[:3], "Approach Play": STAT_KEYS[3:19],
+        "Wedge Game": STAT_KEYS[19:37], "Greenside Bunkers": STAT_KEYS[37:42], "Putting": STAT_KEYS[42:],
+    }
+
+    def legacy_score(stats):
+        P = np.zeros((len(STATES), len(STATES))); P[_s['Hole'], _s['Hole']] = 1.0
+        for f, t, key in _TEMPLATE: P[_s[f], _s[t]] = stats[key]
+        P[_s['Green_Short'], _s['Green_TapIn']] = 1.0 - stats['putt_short_make']
+        P[_s['Green_TapIn'], _s['Hole']] = 0.99; P[_s['Green_TapIn'], _s['Green_TapIn']] = 0.01
+        for i in range(len(STATES)):
+            if i != _s['Hole']:
+                row_sum = P[i].sum()
+                if row_sum > 0: P[i] /= row_sum
+        return GolfHole(STATES, P).calculate_expected_steps('Tee')
+
+    def legacy_rerun(analyze):
+        user_score = legacy_score(user); legacy_score(pro)
+        if analyze:
+            for keys in cats.values():
+                user_score - legacy_score({**user, **{k: pro[k] for k in keys}})
+
+    def rerun(analyze):
+        expected_score(pro); expected_score(user)
+        if analyze:
+            for _, future in submit_category_gains(user, pro, cats): future.result()
+
+    def timed(fn, analyze, runs=200, clear=False):
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            if clear: clear_caches()
+            fn(analyze)
+        return (time.perf_counter() - t0) / runs * 1e6
+
+    assert abs(legacy_score(user) - expected_score(user)) < 1e-12
+    for analyze in (False, True):
+        label = "rerun + analyze" if analyze else "slider rerun"
+        before = timed(legacy_rerun, analyze)
+        cold = timed(rerun, analyze, clear=True)
+        rerun(analyze)
+        warm = timed(rerun, analyze)
+        print(f"{label:<16} | before: {before:8.1f} us | after, cold cache: {cold:8.1f} us | "
+              f"after, warm cache: {warm:8.1f} us | speedup: {before / warm:6.1f}x")
@@ -1,9 +1,15 @@
 import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
 import threading
 
+class TraceChunk(NamedTuple):
+    """A block of simulated walker paths in CSR layout."""
+    states: np.ndarray   # uint8 state codes of every path, concatenated (start state through absorption)
+    offsets: np.ndarray  # int64, path i is states[offsets[i]:offsets[i + 1]]
+    strokes: np.ndarray  # uint16 strokes per path (path length - 1)
+
 class MarkovModel(ABC):
     """Abstract base class for a Markov Chain Model."""
     
@@ -40,34 +46,105 @@ class MarkovModel(ABC):
         pass
 
 class GolfHole(MarkovModel):
-    """Concrete implementation of a Golf Hole using Markov Chains."""
+    """
+    Concrete implementation of a Golf Hole using Markov Chains.
+    Any number of absorbing states is supported (e.g. 'Hole', 'Pick_Up', 'Penalty');
+    by default only the last state ('Hole') is absorbing.
+    """
     
-    def __init__(self, states: List[str], transition_matrix: np.ndarray):
+    def __init__(self, states: List[str], transition_matrix: np.ndarray,
+                 absorbing_states: Optional[List[str]] = None):
         super().__init__(states, transition_matrix)
+        if absorbing_states is None:
+            absorbing_states = [states[-1]]
+        missing = [s for s in absorbing_states if s not in self._state_to_idx]
+        if missing:
+            raise ValueError(f"Absorbing states {missing} not found in model.")
+        self._absorbing_idx = _absorbing_indices(self._P, [self._state_to_idx[s] for s in absorbing_states])
+        self._transient_idx = _transient_indices(len(states), self._absorbing_idx)
+        # Position of each state within the transient block (-1 for absorbing states)
+        self._transient_pos = np.full(len(states), -1)
+        self._transient_pos[self._transient_idx] = np.arange(self._transient_idx.size)
         self._fundamental_matrix = None
 
+    @property
+    def absorbing_states(self) -> List[str]:
+        return [self.states[i] for i in self._absorbing_idx]
+
+    @property
+    def transient_states(self) -> List[str]:
+        return [self.states[i] for i in self._transient_idx]
+
     def _get_fundamental_matrix(self):
         """Thread-safe lazy initialization of the fundamental matrix N."""
         with self._lock:
             if self._fundamental_matrix is None:
-                # Q is the transient state sub-matrix (all but the last 'Hole' state)
-                Q = self._P[:-1, :-1]
+                # Q is the transient state sub-matrix
+                Q = self._P[np.ix_(self._transient_idx, self._transient_idx)]
                 I = np.identity(Q.shape[0])
                 self._fundamental_matrix = np.linalg.inv(I - Q)
             return self._fundamental_matrix
 
-    def calculate_expected_steps(self, start_state: str) -> float:
+    def _transient_start(self, start_state: str) -> int:
+        """Index of start_state within the transient block, or -1 if it is absorbing."""
         if start_state not in self._state_to_idx:
             raise ValueError(f"State '{start_state}' not found in model.")
-            
-        if start_state == self.states[-1]: # Hole
+        return int(self._transient_pos[self._state_to_idx[start_state]])
+
+    def calculate_expected_steps(self, start_state: str) -> float:
+        start_idx = self._transient_start(start_state)
+        if start_idx < 0: # Already absorbed
             return 0.0
         
         N = self._get_fundamental_matrix()
-        start_idx = self._state_to_idx[start_state]
         expected_strokes = N.sum(axis=1)
         return float(expected_strokes[start_idx])
 
+    def absorption_probabilities(self, start_state: str) -> Dict[str, float]:
+        """Probability of finishing in each absorbing state, the start row of B = N R."""
+        start_idx = self._transient_start(start_state)
+        if start_idx < 0:
+            return {s: float(s == start_state) for s in self.absorbing_states}
+
+        N = self._get_fundamental_matrix()
+        R = self._P[np.ix_(self._transient_idx, self._absorbing_idx)]
+        return dict(zip(self.absorbing_states, (N[start_idx] @ R).tolist()))
+
+    def stroke_distribution(self, start_state: str, max_strokes: int = 100) -> np.ndarray:
+        """
+        Exact probability mass function of strokes to absorption (into any absorbing state).
+        Entry k is P(strokes == k) for k = 0..max_strokes; mass beyond max_strokes is dropped.
+        """
+        start_idx = self._transient_start(start_state)
+        pmf = np.zeros(max_strokes + 1)
+        if start_idx < 0: # Already absorbed
+            pmf[0] = 1.0
+            return pmf
+
+        P_local = self.transition_matrix
+        Q = P_local[np.ix_(self._transient_idx, self._transient_idx)]
+        r = P_local[np.ix_(self._transient_idx, self._absorbing_idx)].sum(axis=1)
+        # Row vector of the walker's distribution over transient states
+        x = np.zeros(Q.shape[0])
+        x[start_idx] = 1.0
+        for k in range(1, max_strokes + 1):
+            pmf[k] = x @ r
+            x = x @ Q
+        return pmf
+
+    def capped_expected_steps(self, start_state: str, cap: int,
+                              penalties: Optional[Dict[str, float]] = None) -> float:
+        """
+        E[min(strokes + penalty, cap)], e.g. a net-double-bogey adjusted hole score.
+        penalties maps absorbing states to extra strokes; use np.inf for a pick-up,
+        which always scores the cap.
+        """
+        self._transient_start(start_state)
+        penalty = _penalty_vector(self.absorbing_states, penalties)
+        return float(batch_capped_expected_steps(
+            self.transition_matrix[None], self._state_to_idx[start_state], cap,
+            self._absorbing_idx, penalty)[0])
+
     def simulate(self, start_state: str, num_simulations: int = 1000) -> float:
         if start_state not in self._state_to_idx:
             raise ValueError(f"State '{start_state}' not found in model.")
@@ -75,15 +152,186 @@ class GolfHole(MarkovModel):
         # Thread-safe simulation using a local copy of the transition matrix
         P_local = self.transition_matrix
         start_idx = self._state_to_idx[start_state]
-        hole_idx = len(self.states) - 1
+        absorbing = set(self._absorbing_idx.tolist())
         
         results = []
         for _ in range(num_simulations):
             current_idx = start_idx
             strokes = 0
-            while current_idx != hole_idx:
+            while current_idx not in absorbing:
                 current_idx = np.random.choice(len(self.states), p=P_local[current_idx])
                 strokes += 1
             results.append(strokes)
             
         return float(np.mean(results))
+
+    def simulate_traces(self, start_state: str, num_simulations: int, chunk_size: int = 100_000,
+                        seed: Optional[int] = None) -> Iterator[TraceChunk]:
+        """
+        Generate full shot-by-shot paths in fixed-size chunks, so memory stays bounded by
+        chunk_size regardless of num_simulations. All walkers in a chunk step together.
+        """
+        if start_state not in self._state_to_idx:
+            raise ValueError(f"State '{start_state}' not found in model.")
+        if len(self.states) > 256:
+            raise ValueError("Trace mode stores uint8 state codes and supports at most 256 states")
+
+        rng = np.random.default_rng(seed)
+        cum_P = np.cumsum(self.transition_matrix, axis=1)
+        cum_P[:, -1] = 1.0  # Guard against rounding leaving u >= row sum
+        start_idx = self._state_to_idx[start_state]
+        is_absorbing = self._transient_pos < 0
+
+        for first in range(0, num_simulations, chunk_size):
+            n = min(chunk_size, num_simulations - first)
+            current = np.full(n, start_idx, dtype=np.uint8)
+            lengths = np.ones(n, dtype=np.int64)
+            steps = [current.copy()]
+            active = np.flatnonzero(~is_absorbing[current])
+            while active.size:
+                u = rng.random(active.size)
+                nxt = (u[:, None] >= cum_P[current[active]]).sum(axis=1)
+                current[active] = nxt
+                lengths[active] += 1
+                steps.append(current.copy())
+                active = active[~is_absorbing[nxt]]
+
+            # Walker-major flattening of the (walker, step) grid, keeping each walker's live prefix
+            grid = np.stack(steps, axis=1)
+            mask = np.arange(grid.shape[1])[None, :] < lengths[:, None]
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            yield TraceChunk(grid[mask], offsets, (lengths - 1).astype(np.uint16))
+
+def _check_state_indices(indices: Sequence[int], n: int, name: str) -> np.ndarray:
+    """Integer state indices as an array; anything outside [0, n) is rejected rather than wrapped."""
+    idx = np.asarray(indices)
+    if idx.size and (idx.dtype.kind not in 'iu' or np.any((idx < 0) | (idx >= n))):
+        raise ValueError(f"{name} must be state indices in [0, {n}), got {np.asarray(indices).tolist()}")
+    return idx.astype(int)
+
+def _absorbing_indices(P: np.ndarray, absorbing_idx: Optional[Sequence[int]]) -> np.ndarray:
+    """Sorted absorbing state indices (default: the last state), checked against a (..., n, n) stack."""
+    n = P.shape[-1]
+    absorbing = np.unique(_check_state_indices([n - 1] if absorbing_idx is None else absorbing_idx, n, "absorbing_idx"))
+    if absorbing.size == 0:
+        raise ValueError("Model must have at least one absorbing state")
+    if np.any(np.abs(P[..., absorbing, absorbing] - 1.0) > 1e-8):
+        raise ValueError("Absorbing states must transition to themselves with probability 1.0")
+    return absorbing
+
+def _transient_indices(n: int, absorbing: np.ndarray) -> np.ndarray:
+    is_transient = np.ones(n, dtype=bool)
+    is_transient[absorbing] = False
+    return np.flatnonzero(is_transient)
+
+def _penalty_vector(absorbing_states: List[str], penalties: Optional[Dict[str, float]]) -> np.ndarray:
+    penalties = penalties or {}
+    unknown = set(penalties) - set(absorbing_states)
+    if unknown:
+        raise ValueError(f"Penalties given for non-absorbing states {sorted(unknown)}")
+    return np.array([penalties.get(s, 0.0) for s in absorbing_states], dtype=float)
+
+def _split_stack(transition_matrices: np.ndarray, absorbing_idx: Optional[Sequence[int]],
+                 start_idx: Optional[int] = None):
+    """Validate a (..., n, n) stack (and start_idx, if given) and return it with its transient and absorbing indices."""
+    P = np.asarray(transition_matrices, dtype=float)
+    if P.ndim < 3 or P.shape[-1] != P.shape[-2]:
+        raise ValueError("Expected a stack of square transition matrices with shape (..., n, n)")
+    if start_idx is not None:
+        _check_state_indices([start_idx], P.shape[-1], "start_idx")
+    if not np.allclose(P.sum(axis=-1), 1.0):
+        raise ValueError("Rows of the transition matrix must sum to 1.0")
+    absorbing = _absorbing_indices(P, absorbing_idx)
+    transient = _transient_indices(P.shape[-1], absorbing)
+    return P, transient, absorbing
+
+def batch_expected_steps(transition_matrices: np.ndarray, start_idx: int = 0,
+                         absorbing_idx: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Expected steps to absorption for a stack of chains sharing one state layout,
+    using a single stacked solve of (I - Q) t = 1. Only the last state is absorbing
+    unless absorbing_idx is given.
+    """
+    P, transient, absorbing = _split_stack(transition_matrices, absorbing_idx, start_idx)
+    if start_idx in absorbing:
+        return np.zeros(P.shape[:-2])
+
+    Q = P[..., transient[:, None], transient]
+    I_minus_Q = np.identity(transient.size) - Q
+    ones = np.ones(Q.shape[:-1] + (1,))
+    return np.linalg.solve(I_minus_Q, ones)[..., np.searchsorted(transient, start_idx), 0]
+
+def batch_absorption_probabilities(transition_matrices: np.ndarray,
+                                   absorbing_idx: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Absorption probabilities B = N R for a stack of chains, shape (..., transient, absorbing):
+    B[..., i, a] is the probability that a walker starting in the i-th transient state
+    finishes in the a-th absorbing state.
+    """
+    P, transient, absorbing = _split_stack(transition_matrices, absorbing_idx)
+    Q = P[..., transient[:, None], transient]
+    R = P[..., transient[:, None], absorbing]
+    return np.linalg.solve(np.identity(transient.size) - Q, R)
+
+def batch_stroke_distributions(transition_matrices: np.ndarray, start_idx: int = 0, max_strokes: int = 100,
+                               absorbing_idx: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Stroke PMFs for a stack of chains of shape (..., n, n), shape (..., max_strokes + 1):
+    entry k is P(strokes == k) to absorption into any absorbing state. Every chain's
+    walker distribution advances together, one einsum per stroke; mass beyond
+    max_strokes is dropped.
+    """
+    P, transient, absorbing = _split_stack(transition_matrices, absorbing_idx, start_idx)
+    pmf = np.zeros(P.shape[:-2] + (max_strokes + 1,))
+    if start_idx in absorbing:
+        pmf[..., 0] = 1.0
+        return pmf
+
+    Q = P[..., transient[:, None], transient]
+    r = P[..., transient[:, None], absorbing].sum(axis=-1)
+    x = np.zeros(Q.shape[:-1])
+    x[..., np.searchsorted(transient, start_idx)] = 1.0
+    for k in range(1, max_strokes + 1):
+        pmf[..., k] = np.einsum('...i,...i->...', x, r)
+        x = np.einsum('...i,...ij->...j', x, Q)
+    return pmf
+
+def batch_capped_expected_steps(transition_matrices: np.ndarray, start_idx: int, caps,
+                                absorbing_idx: Optional[Sequence[int]] = None,
+                                penalties: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    E[min(strokes + penalty, cap)] for a stack of chains of shape (..., n, n), from the
+    stroke distribution truncated at each cap. caps broadcasts against the leading dims
+    (e.g. (players, 18) net-double-bogey caps); penalties holds one value per absorbing
+    state (np.inf for a pick-up).
+
+    A walker still in play after cap - 1 strokes scores the cap; one absorbed into state a
+    at stroke k < cap scores min(k + penalty[a], cap).
+    """
+    P, transient, absorbing = _split_stack(transition_matrices, absorbing_idx, start_idx)
+    caps = np.broadcast_to(np.asarray(caps, dtype=float), P.shape[:-2])
+    if np.any(caps < 1) or np.any(caps != np.floor(caps)):
+        raise ValueError("Caps must be positive whole numbers of strokes")
+    penalty = np.zeros(absorbing.size) if penalties is None else np.asarray(penalties, dtype=float)
+    if penalty.shape != (absorbing.size,):
+        raise ValueError(f"Expected one penalty per absorbing state ({absorbing.size}), got shape {penalty.shape}")
+    if not np.all(penalty >= 0):
+        raise ValueError("Penalties must be non-negative")
+    if start_idx in absorbing:
+        return np.zeros(caps.shape)
+
+    Q = P[..., transient[:, None], transient]
+    R = P[..., transient[:, None], absorbing]
+    # Row vectors of the walkers' distribution over transient states, one per chain
+    x = np.zeros(Q.shape[:-1])
+    x[..., np.searchsorted(transient, start_idx)] = 1.0
+    expected = np.zeros(caps.shape)
+    for k in range(1, int(caps.max()) + 1):
+        reached_cap = caps == k
+        expected += np.where(reached_cap, caps * x.sum(axis=-1), 0.0)
+        absorbed = np.einsum('...i,...ia->...a', x, R)
+        scores = np.minimum(k + penalty, caps[..., None])
+        expected += np.where(caps > k, (absorbed * scores).sum(axis=-1), 0.0)
+        x = np.einsum('...i,...ij->...j', x, Q)
+    return expected
@@ -0,0 +1,118 @@
+import numpy as np
+from typing import Optional, Sequence
+from markov_golf_engine import batch_capped_expected_steps
+
+"""
+CAPPED SCORING & HANDICAP INDEX (World Handicap System)
+Vectorized over players: every function takes a leading player axis.
+
+- Net double bogey: the maximum hole score for handicap purposes is
+  par + 2 + handicap strokes received on that hole.
+- Adjusted gross score: the round total after applying the per-hole caps.
+- Score differential: (113 / slope) * (adjusted gross - course rating - PCC),
+  rounded to the nearest tenth.
+- Handicap index: mean of the lowest differentials among the most recent 20,
+  with the WHS count/adjustment table for shorter histories.
+"""
+
+STANDARD_SLOPE = 113
+MAX_HANDICAP_INDEX = 54.0
+
+# Rounds in history -> (number of lowest differentials averaged, adjustment)
+_WHS_TABLE = {
+    3: (1, -2.0), 4: (1, -1.0), 5: (1, 0.0), 6: (2, -1.0), 7: (2, 0.0), 8: (2, 0.0),
+    9: (3, 0.0), 10: (3, 0.0), 11: (3, 0.0), 12: (4, 0.0), 13: (4, 0.0), 14: (4, 0.0),
+    15: (5, 0.0), 16: (5, 0.0), 17: (6, 0.0), 18: (6, 0.0), 19: (7, 0.0), 20: (8, 0.0),
+}
+
+
+def _round_tenth(x: np.ndarray) -> np.ndarray:
+    """Round half up to one decimal, as WHS does for differentials and the index."""
+    return np.floor(np.asarray(x) * 10 + 0.5) / 10
+
+
+def net_double_bogey_caps(par: Sequence[int], stroke_index: Sequence[int], course_handicap) -> np.ndarray:
+    """
+    Per-hole caps of shape (players, holes).
+    A course handicap of C gives every hole C // holes strokes, plus one more on the
+    C % holes holes with the lowest stroke index.
+    """
+    par = np.asarray(par)
+    stroke_index = np.asarray(stroke_index)
+    course_handicap = np.atleast_1d(np.asarray(course_handicap, dtype=int))[:, None]
+    holes = len(par)
+    received = course_handicap // holes + (stroke_index[None, :] <= course_handicap % holes)
+    return par[None, :] + 2 + received
+
+
+def adjusted_gross_scores(hole_scores: np.ndarray, caps: np.ndarray) -> np.ndarray:
+    """Round totals after capping each hole; hole_scores is (players, rounds, holes), caps (players, holes)."""
+    return np.minimum(hole_scores, np.asarray(caps)[:, None, :]).sum(axis=-1)
+
+
+def score_differentials(adjusted_gross, course_rating, slope, pcc=0.0) -> np.ndarray:
+    return _round_tenth(STANDARD_SLOPE / np.asarray(slope, dtype=float) * (np.asarray(adjusted_gross) - course_rating - pcc))
+
+
+def handicap_index(differentials: np.ndarray) -> np.ndarray:
+    """Handicap index per player from (players, rounds) differentials, most recent round last."""
+    differentials = np.asarray(differentials, dtype=float)[:, -20:]
+    rounds = differentials.shape[1]
+    if rounds not in _WHS_TABLE:
+        raise ValueError("A handicap index needs at least 3 rounds")
+    count, adjustment = _WHS_TABLE[rounds]
+    lowest = np.sort(differentials, axis=1)[:, :count]
+    index = _round_tenth(lowest.mean(axis=1) + adjustment)
+    return np.minimum(index, MAX_HANDICAP_INDEX)
+
+
+def handicap_index_from_history(hole_scores: np.ndarray, caps: np.ndarray, course_rating, slope,
+                                pcc=0.0) -> np.ndarray:
+    """
+    Handicap index for many players in one pass.
+    hole_scores: (players, rounds, holes); caps: (players, holes);
+    course_rating / slope / pcc broadcast against (players, rounds).
+    """
+    ags = adjusted_gross_scores(hole_scores, caps)
+    return handicap_index(score_differentials(ags, course_rating, slope, pcc))
+
+
+def expected_adjusted_gross(transition_matrices: np.ndarray, caps: np.ndarray, start_idx: int = 0,
+                            absorbing_idx: Optional[Sequence[int]] = None,
+                            penalties: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Model-based expected adjusted gross score per player: the sum over holes of
+    E[min(strokes, cap)], with transition_matrices of shape (players, holes, n, n)
+    and caps of shape (players, holes).
+    """
+    return batch_capped_expected_steps(transition_matrices, start_idx, caps, absorbing_idx, penalties).sum(axis=-1)
+
+
+if __name__ == "__main__":
+    # 1,000 players x 20 rounds x 18 holes of synthetic scores on a par-72 course
+    rng = np.random.default_rng(0)
+    players = 1000
+    par = np.array([4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 3, 4, 5, 4, 4, 3, 4, 5])
+    stroke_index = rng.permutation(18) + 1
+    course_handicap = rng.integers(0, 36, players)
+    hole_scores = par + rng.poisson(course_handicap[:, None, None] / 18 + 0.3, (players, 20, 18))
+
+    caps = net_double_bogey_caps(par, stroke_index, course_handicap)
+    index = handicap_index_from_history(hole_scores, caps, course_rating=71.2, slope=128)
+    print("="*60)
+    print(f"HANDICAP INDEX | {players:,} players x 20 rounds")
+    print("="*60)
+    for i in range(5):
+        print(f"Player {i + 1} | Course Handicap: {course_handicap[i]:2d} | Handicap Index: {index[i]:.1f}")
+
+    # Model-based: expected adjusted gross when a 10% pick-up chance on every shot scores the cap
+    P = np.array([
+        [0.00, 0.80, 0.10, 0.10],  # Tee
+        [0.00, 0.45, 0.10, 0.45],  # Green
+        [0.00, 0.00, 1.00, 0.00],  # Pick_Up
+        [0.00, 0.00, 0.00, 1.00],  # Hole
+    ])
+    models = np.broadcast_to(P, (5, 18) + P.shape)
+    expected = expected_adjusted_gross(models, caps[:5], absorbing_idx=[2, 3], penalties=[np.inf, 0.0])
+    for i in range(5):
+        print(f"Player {i + 1} | Expected adjusted gross (pick-up model): {expected[i]:.2f}")
@@ -0,0 +1,161 @@
+import numpy as np
+from typing import Dict, List, Sequence, Tuple, Union
+from markov_golf_engine import GolfHole, batch_stroke_distributions
+
+"""
+HEAD-TO-HEAD MATCH PLAY ENGINE
+Win / halve / lose probabilities per hole and per match between two GolfHole models.
+
+The two players' chains are independent, so the joint chain (Kronecker product of
+both transition matrices plus match-status states) never needs to be built:
+- Per hole, A wins when A's strokes < B's strokes. With PMFs p_A, p_B and B's
+  survival S_B(k) = P(B > k): P(win) = sum_k p_A(k) S_B(k), P(halve) = sum_k p_A(k) p_B(k).
+- Per match, a dynamic program over the holes-up status (-H..+H) rolls the per-hole
+  outcomes forward. Playing out a decided match cannot flip the sign of the lead,
+  so the final status after all holes gives the match result exactly.
+
+Everything is vectorized over a leading batch axis of pairings; the stroke PMFs of
+all models sharing a state layout are propagated together in one stacked pass.
+
+PMFs are truncated at MAX_STROKES. A player still in play at the cutoff still counts
+as losing to one who has holed out, so only the joint tail (both players beyond the
+cutoff) is unresolved; hole_outcomes raises rather than guess an outcome for it.
+"""
+
+MAX_STROKES = 100  # PMF truncation; tail mass beyond this is negligible for realistic chains
+TAIL_TOLERANCE = 1e-9  # Largest joint tail mass hole_outcomes accepts as numerically zero
+
+Player = Union[GolfHole, Sequence[GolfHole]]  # one model for every hole, or one model per hole
+
+
+def stroke_pmfs(models: Sequence[GolfHole], start_state: str = 'Tee',
+                max_strokes: int = MAX_STROKES) -> np.ndarray:
+    """
+    Stroke PMFs of shape (len(models), max_strokes + 1).
+    Shared models are solved once; models with the same states and absorbing states
+    are stacked and solved together by batch_stroke_distributions.
+    """
+    groups: Dict[tuple, Dict[int, GolfHole]] = {}
+    for model in {id(model): model for model in models}.values():
+        if start_state not in model.states:
+            raise ValueError(f"State '{start_state}' not found in model.")
+        absorbing = tuple(model.states.index(s) for s in model.absorbing_states)
+        groups.setdefault((tuple(model.states), absorbing), {})[id(model)] = model
+
+    solved: Dict[int, np.ndarray] = {}
+    for (states, absorbing), group in groups.items():
+        stack = np.stack([model.transition_matrix for model in group.values()])
+        pmfs = batch_stroke_distributions(stack, states.index(start_state), max_strokes, absorbing)
+        solved.update(zip(group, pmfs))
+    return np.array([solved[id(model)] for model in models])
+
+
+def hole_outcomes(pmf_a: np.ndarray, pmf_b: np.ndarray) -> np.ndarray:
+    """
+    Per-hole (win, halve, lose) probabilities for player A.
+    Accepts PMFs of shape (..., K) and returns an array of shape (..., 3).
+    Raises ValueError if both players can run past the PMF cutoff with probability
+    above TAIL_TOLERANCE; raise max_strokes instead of dropping that mass.
+    """
+    surv_a = 1.0 - np.cumsum(pmf_a, axis=-1)
+    surv_b = 1.0 - np.cumsum(pmf_b, axis=-1)
+    unresolved = surv_a[..., -1] * surv_b[..., -1]
+    if np.any(unresolved > TAIL_TOLERANCE):
+        raise ValueError(f"Both players exceed the {pmf_a.shape[-1] - 1}-stroke cutoff with probability up to "
+                         f"{unresolved.max():.2e}; increase max_strokes")
+    win = np.sum(pmf_a * surv_b, axis=-1)
+    halve = np.sum(pmf_a * pmf_b, axis=-1)
+    lose = np.sum(pmf_b * surv_a, axis=-1)
+    return np.stack([win, halve, lose], axis=-1)
+
+
+def match_outcomes(hole_probs: np.ndarray, holes: int = 18) -> np.ndarray:
+    """
+    Match (win, halve, lose) probabilities for player A.
+    hole_probs has shape (B, 3) for the same odds on every hole, or (B, holes, 3).
+    """
+    hole_probs = np.asarray(hole_probs, dtype=float)
+    if hole_probs.ndim == 2:
+        hole_probs = np.repeat(hole_probs[:, None, :], holes, axis=1)
+    if hole_probs.shape[1] != holes:
+        raise ValueError(f"Expected per-hole probabilities for {holes} holes, got {hole_probs.shape[1]}")
+
+    # status[:, holes + d] = P(A is d holes up)
+    status = np.zeros((hole_probs.shape[0], 2 * holes + 1))
+    status[:, holes] = 1.0
+    for h in range(holes):
+        win, halve, lose = (hole_probs[:, h, i:i + 1] for i in range(3))
+        nxt = status * halve
+        nxt[:, 1:] += status[:, :-1] * win
+        nxt[:, :-1] += status[:, 1:] * lose
+        status = nxt
+
+    return np.stack([
+        status[:, holes + 1:].sum(axis=1),
+        status[:, holes],
+        status[:, :holes].sum(axis=1),
+    ], axis=1)
+
+
+def _per_hole_models(player: Player, holes: int) -> List[GolfHole]:
+    if isinstance(player, GolfHole):
+        return [player] * holes
+    if len(player) != holes:
+        raise ValueError(f"Expected {holes} hole models, got {len(player)}")
+    return list(player)
+
+
+def match_play_batch(pairings: Sequence[Tuple[Player, Player]], holes: int = 18,
+                     start_state: str = 'Tee', max_strokes: int = MAX_STROKES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate many pairings at once.
+    Returns (hole_probs of shape (B, holes, 3), match_probs of shape (B, 3)), both from A's side.
+    """
+    models_a = [m for a, _ in pairings for m in _per_hole_models(a, holes)]
+    models_b = [m for _, b in pairings for m in _per_hole_models(b, holes)]
+    pmfs = stroke_pmfs(models_a + models_b, start_state, max_strokes).reshape(2, len(pairings), holes, -1)
+    hole_probs = hole_outcomes(pmfs[0], pmfs[1])
+    return hole_probs, match_outcomes(hole_probs, holes)
+
+
+def match_play(player_a: Player, player_b: Player, holes: int = 18, start_state: str = 'Tee',
+               max_strokes: int = MAX_STROKES) -> Dict[str, Union[float, List[float]]]:
+    """
+    Match-play probabilities for a single pairing, from player A's side.
+    hole_win / hole_halve / hole_lose hold one probability per hole; match_* are scalars.
+    """
+    hole_probs, match_probs = match_play_batch([(player_a, player_b)], holes, start_state, max_strokes)
+    return {
+        'hole_win': hole_probs[0, :, 0].tolist(), 'hole_halve': hole_probs[0, :, 1].tolist(),
+        'hole_lose': hole_probs[0, :, 2].tolist(),
+        'match_win': float(match_probs[0, 0]), 'match_halve': float(match_probs[0, 1]), 'match_lose': float(match_probs[0, 2]),
+    }
+
+
+if __name__ == "__main__":
+    import time
+    from markov_golf_compute import STAT_KEYS, STATES, build_transition_matrix, stats_key
+
+    rng = np.random.default_rng(0)
+    pro = GolfHole(STATES, build_transition_matrix(stats_key(dict(zip(STAT_KEYS, rng.uniform(0.05, 0.9, len(STAT_KEYS)))))))
+    users = [GolfHole(STATES, build_transition_matrix(stats_key(dict(zip(STAT_KEYS, rng.uniform(0.05, 0.9, len(STAT_KEYS)))))))
+             for _ in range(5)]
+
+    _, match_probs = match_play_batch([(user, pro) for user in users])
+    print("="*60)
+    print("MATCH PLAY | User vs Pro over 18 holes")
+    print("="*60)
+    for i, (user, (w, h, l)) in enumerate(zip(users, match_probs)):
+        print(f"User {i + 1} (E={user.calculate_expected_steps('Tee'):.2f} vs {pro.calculate_expected_steps('Tee'):.2f}) "
+              f"| Win: {w:.3f} | Halve: {h:.3f} | Lose: {l:.3f}")
+
+    # Stacked PMFs vs. propagating each model's walker on its own
+    field = [GolfHole(STATES, build_transition_matrix(stats_key(dict(zip(STAT_KEYS, rng.uniform(0.05, 0.9, len(STAT_KEYS)))))))
+             for _ in range(1000)]
+    t0 = time.perf_counter()
+    for model in [pro] + field: model.stroke_distribution('Tee', MAX_STROKES)
+    before = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    match_play_batch([(user, pro) for user in field])
+    after = time.perf_counter() - t0
+    print(f"1,000 pairings x 18 holes | per-model PMFs only: {before * 1e3:.0f} ms | stacked, full match: {after * 1e3:.0f} ms")
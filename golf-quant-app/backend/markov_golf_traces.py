@@ -0,0 +1,162 @@
+import json
+import os
+import struct
+import numpy as np
+from typing import Iterable, Iterator, List, Optional, Tuple
+from markov_golf_engine import TraceChunk
+
+"""
+SHOT-TRACE EXPORT
+Streams GolfHole.simulate_traces() chunks to disk and reads them back lazily.
+
+A trace store is a directory of memory-mappable .npy columns:
+- states.npy:  uint8 state codes of every path, concatenated (CSR values)
+- offsets.npy: int64, path i is states[offsets[i]:offsets[i + 1]] (CSR index, length N + 1)
+- strokes.npy: uint16 strokes per path
+- meta.json:   state names, so codes can be decoded
+
+Columns are appended chunk by chunk, so writing needs only one chunk in RAM.
+The final .npy headers and meta.json are only written once every chunk is in;
+a failed export removes its partial columns instead of leaving a readable store.
+"""
+
+_HEADER_SIZE = 128  # Fixed .npy v1.0 header, rewritten in place with the final shape on commit
+
+
+class _NpyAppender:
+    """Append-only 1-D .npy file whose header is patched once the length is known."""
+
+    def __init__(self, path: str, dtype: np.dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self._file = open(path, 'wb')
+        self._file.write(b'\0' * _HEADER_SIZE)  # Placeholder until commit(); not a valid .npy yet
+
+    def _write_header(self):
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                       'shape': (self.length,)})
+        # magic (6) + version (2) + header length (2) + padded header ending in '\n'
+        header = header.ljust(_HEADER_SIZE - 10 - 1) + '\n'
+        if len(header) != _HEADER_SIZE - 10:
+            raise ValueError("Trace column too large for the reserved .npy header")
+        self._file.seek(0)
+        self._file.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+
+    def append(self, values: np.ndarray):
+        self._file.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+        self.length += len(values)
+
+    def commit(self):
+        self._write_header()
+        self._file.close()
+
+    def discard(self):
+        self._file.close()
+        os.remove(self.path)
+
+
+def write_traces(path: str, chunks: Iterable[TraceChunk], states: List[str]) -> int:
+    """Write trace chunks to a trace store directory; returns the number of paths written."""
+    os.makedirs(path, exist_ok=True)
+    meta_path = os.path.join(path, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)  # An overwritten store is unreadable until this write succeeds
+
+    columns = {}
+    try:
+        for name, dtype in (('states', np.uint8), ('offsets', np.int64), ('strokes', np.uint16)):
+            columns[name] = _NpyAppender(os.path.join(path, f'{name}.npy'), dtype)
+        columns['offsets'].append(np.zeros(1))
+        for chunk in chunks:
+            # Chunk offsets are local; shift them by the number of codes already written
+            columns['offsets'].append(chunk.offsets[1:] + columns['states'].length)
+            columns['states'].append(chunk.states)
+            columns['strokes'].append(chunk.strokes)
+        for column in columns.values():
+            column.commit()
+    except BaseException:
+        for column in columns.values():
+            column.discard()
+        raise
+    with open(meta_path, 'w') as f:
+        json.dump({'states': list(states)}, f)
+    return columns['strokes'].length
+
+
+class TraceReader:
+    """Memory-mapped view of a trace store with streaming filters."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.state_names: List[str] = json.load(f)['states']
+        self.states = np.load(os.path.join(path, 'states.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+        self.strokes = np.load(os.path.join(path, 'strokes.npy'), mmap_mode='r')
+        if len(self.offsets) != len(self.strokes) + 1 or self.offsets[-1] != len(self.states):
+            raise ValueError(f"Inconsistent trace store at {path}: {len(self.strokes)} strokes, "
+                             f"{len(self.offsets)} offsets ending at {self.offsets[-1]}, {len(self.states)} states")
+
+    def __len__(self) -> int:
+        return len(self.strokes)
+
+    def trace(self, i: int) -> np.ndarray:
+        return np.asarray(self.states[self.offsets[i]:self.offsets[i + 1]])
+
+    def decode(self, codes: np.ndarray) -> List[str]:
+        return [self.state_names[c] for c in codes]
+
+    def filter(self, start_state: Optional[str] = None, strokes: Optional[int] = None,
+               min_strokes: Optional[int] = None, max_strokes: Optional[int] = None,
+               chunk_size: int = 1_000_000) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield (trace index, state codes) for every path matching all given criteria.
+        Scans the columns chunk_size paths at a time, so RAM stays bounded.
+        """
+        start_code = self.state_names.index(start_state) if start_state is not None else None
+        for first in range(0, len(self), chunk_size):
+            last = min(first + chunk_size, len(self))
+            s = np.asarray(self.strokes[first:last])
+            mask = np.ones(len(s), dtype=bool)
+            if strokes is not None: mask &= s == strokes
+            if min_strokes is not None: mask &= s >= min_strokes
+            if max_strokes is not None: mask &= s <= max_strokes
+            offsets = np.asarray(self.offsets[first:last + 1])
+            if start_code is not None:
+                mask &= self.states[offsets[:-1]] == start_code
+            for i in np.flatnonzero(mask):
+                yield first + int(i), np.asarray(self.states[offsets[i]:offsets[i + 1]])
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+    from markov_golf_engine import GolfHole
+
+    states = ['Tee', 'Fairway', 'Rough', 'Bunker', 'Green', 'Hole']
+    P = np.array([
+        [0.00, 0.60, 0.30, 0.05, 0.05, 0.00],  # Tee
+        [0.00, 0.00, 0.10, 0.10, 0.75, 0.05],  # Fairway
+        [0.00, 0.00, 0.20, 0.20, 0.55, 0.05],  # Rough
+        [0.00, 0.00, 0.10, 0.20, 0.60, 0.10],  # Bunker
+        [0.00, 0.00, 0.00, 0.00, 0.50, 0.50],  # Green
+        [0.00, 0.00, 0.00, 0.00, 0.00, 1.00]   # Hole
+    ])
+    hole = GolfHole(states, P)
+    num_simulations = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+
+    with tempfile.TemporaryDirectory() as path:
+        t0 = time.perf_counter()
+        written = write_traces(path, hole.simulate_traces('Tee', num_simulations, seed=0), states)
+        elapsed = time.perf_counter() - t0
+        reader = TraceReader(path)
+        size_mb = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+        print(f"Wrote {written:,} traces ({size_mb:.1f} MB) in {elapsed:.1f}s")
+        print(f"Mean strokes: {reader.strokes.mean():.4f} (exact: {hole.calculate_expected_steps('Tee'):.4f})")
+
+        double_bogeys = sum(1 for _ in reader.filter(strokes=6))
+        print(f"Double bogeys (6 strokes): {double_bogeys:,} ({double_bogeys / written:.2%})")
+        for i, codes in reader.filter(min_strokes=6):
+            print(f"First double bogey or worse, trace {i}: {' -> '.join(reader.decode(codes))}")
+            break
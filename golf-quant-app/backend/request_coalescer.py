@@ -0,0 +1,128 @@
+import asyncio
+import time
+import numpy as np
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from markov_golf_engine import batch_expected_steps
+
+"""
+REQUEST COALESCER
+Micro-batches concurrent requests arriving on one asyncio event loop.
+
+Each request parks a future on the collector. The pending batch is flushed after
+`window_ms` or as soon as `max_batch_size` requests are waiting, solved in one
+call on a worker thread, and every waiter receives its own result (or exception).
+If the whole batch fails, or solve_batch returns the wrong number of results, every
+waiter gets its own BatchSolveError chained to the underlying cause.
+"""
+
+
+class BatchSolveError(RuntimeError):
+    """A batch solve failed as a whole; __cause__ holds the original exception."""
+
+
+class RequestCoalescer:
+    def __init__(self, solve_batch: Callable[[List[Any]], Sequence[Any]],
+                 window_ms: float = 2.0, max_batch_size: int = 256):
+        if window_ms < 0 or max_batch_size < 1:
+            raise ValueError("window_ms must be >= 0 and max_batch_size must be >= 1")
+        self.solve_batch = solve_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            results = list(await asyncio.get_running_loop().run_in_executor(None, self.solve_batch, items))
+            if len(results) != len(batch):
+                raise ValueError(f"solve_batch returned {len(results)} results for {len(batch)} requests")
+        except Exception as e:
+            # One exception instance per waiter, so tracebacks are not shared across requests
+            results = []
+            for _ in batch:
+                error = BatchSolveError(f"Batch of {len(batch)} requests failed: {e}")
+                error.__cause__ = e
+                results.append(error)
+        for (_, future), result in zip(batch, results):
+            if future.done():  # Waiter was cancelled (e.g. client disconnected)
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def solve_expected_steps(transition_matrices: List[np.ndarray], start_idx: int = 0) -> List[Any]:
+    """
+    Batch solver for RequestCoalescer: expected steps from start_idx for each matrix.
+    A malformed or singular matrix only fails its own request.
+    """
+    try:
+        return [float(x) for x in batch_expected_steps(np.stack(transition_matrices), start_idx)]
+    except (ValueError, np.linalg.LinAlgError):
+        if len(transition_matrices) == 1:
+            raise
+        results = []
+        for P in transition_matrices:
+            try:
+                results.append(solve_expected_steps([P], start_idx)[0])
+            except (ValueError, np.linalg.LinAlgError) as e:
+                results.append(e)
+        return results
+
+
+if __name__ == "__main__":
+    # Local load generator: bursts of concurrent single-matrix requests, served either
+    # one solve per request on the thread pool (the old sync endpoint) or coalesced.
+    n_states, bursts, burst_size = 11, 20, 500
+    rng = np.random.default_rng(0)
+
+    def random_chain():
+        P = np.zeros((n_states, n_states))
+        P[:-1] = rng.dirichlet(np.ones(n_states), size=n_states - 1)
+        P[-1, -1] = 1.0
+        return P
+
+    requests = [random_chain() for _ in range(burst_size)]
+
+    async def unbatched(P):
+        return (await asyncio.get_running_loop().run_in_executor(None, solve_expected_steps, [P]))[0]
+
+    async def run(handler):
+        latencies = []
+
+        async def client(P):
+            t0 = time.perf_counter()
+            await handler(P)
+            latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for _ in range(bursts):
+            await asyncio.gather(*(client(P) for P in requests))
+        elapsed = time.perf_counter() - t0
+        return np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3, len(latencies) / elapsed
+
+    print(f"{bursts} bursts of {burst_size} concurrent requests ({n_states}-state chains)")
+    for label, handler in [("per-request", unbatched),
+                           ("coalesced 2ms/256", RequestCoalescer(solve_expected_steps, 2.0, 256).submit)]:
+        p50, p99, rps = asyncio.run(run(handler))
+        print(f"{label:<18} | p50: {p50:7.2f} ms | p99: {p99:7.2f} ms | throughput: {rps:9.0f} req/s")
@@ -1,7 +1,8 @@
 import unittest
 import numpy as np
 import threading
-from markov_golf_engine import GolfHole
+from markov_golf_engine import GolfHole, batch_absorption_probabilities, batch_capped_expected_steps, batch_expected_steps, \
+    batch_stroke_distributions
 
 class TestGolfHole(unittest.TestCase):
     def setUp(self):
@@ -30,6 +31,103 @@ class TestGolfHole(unittest.TestCase):
         self.assertAlmostEqual(self.model.calculate_expected_steps('Green'), 2.0, places=5)
         self.assertEqual(self.model.calculate_expected_steps('Hole'), 0.0)
 
+    def test_stroke_distribution(self):
+        """Verify the exact stroke PMF against the hand-derived distribution."""
+        # From Tee: 1 stroke w.p. 0.2, otherwise 1 + Geometric(0.5) strokes from Green
+        pmf = self.model.stroke_distribution('Tee', max_strokes=50)
+        self.assertAlmostEqual(pmf[1], 0.2)
+        self.assertAlmostEqual(pmf[2], 0.8 * 0.5)
+        self.assertAlmostEqual(pmf[3], 0.8 * 0.25)
+        self.assertAlmostEqual(pmf.sum(), 1.0, places=10)
+        self.assertAlmostEqual(np.dot(np.arange(51), pmf), 2.6, places=10)
+        self.assertEqual(self.model.stroke_distribution('Hole')[0], 1.0)
+
+    def test_batch_expected_steps(self):
+        """Verify the stacked solve matches the per-model fundamental matrix."""
+        P2 = np.array([
+            [0.0, 0.9, 0.1],
+            [0.0, 0.4, 0.6],
+            [0.0, 0.0, 1.0]
+        ])
+        expected = batch_expected_steps(np.stack([self.P, P2]), start_idx=0)
+        self.assertAlmostEqual(expected[0], 2.6, places=10)
+        self.assertAlmostEqual(expected[1], GolfHole(self.states, P2).calculate_expected_steps('Tee'), places=10)
+        with self.assertRaises(ValueError):
+            batch_expected_steps(np.stack([self.P * 0.5]))
+
+    def test_batch_index_validation(self):
+        """Verify start and absorbing indices outside [0, n) are rejected instead of wrapped."""
+        stack = np.stack([self.P, self.P])
+        for start_idx in (-1, 3):
+            with self.assertRaises(ValueError):
+                batch_expected_steps(stack, start_idx=start_idx)
+            with self.assertRaises(ValueError):
+                batch_capped_expected_steps(stack, start_idx, 4)
+            with self.assertRaises(ValueError):
+                batch_stroke_distributions(stack, start_idx)
+        for absorbing_idx in ([-1], [3], [0.5]):
+            with self.assertRaises(ValueError):
+                batch_absorption_probabilities(stack, absorbing_idx)
+        np.testing.assert_allclose(batch_expected_steps(stack, start_idx=2, absorbing_idx=[2]), 0.0)
+        np.testing.assert_allclose(batch_stroke_distributions(stack, 1, 60).sum(axis=-1), 1.0)
+
+    def test_multiple_absorbing_states(self):
+        """Verify absorption probabilities B = N R with a pick-up state."""
+        states = ['Tee', 'Green', 'Pick_Up', 'Hole']
+        P = np.array([
+            [0.0, 0.7, 0.1, 0.2],
+            [0.0, 0.5, 0.1, 0.4],
+            [0.0, 0.0, 1.0, 0.0],
+            [0.0, 0.0, 0.0, 1.0]
+        ])
+        model = GolfHole(states, P, absorbing_states=['Pick_Up', 'Hole'])
+        self.assertEqual(model.transient_states, ['Tee', 'Green'])
+        # From Green: Pick_Up = 0.1 / 0.5 = 0.2; from Tee: 0.1 + 0.7 * 0.2 = 0.24
+        probs = model.absorption_probabilities('Tee')
+        self.assertAlmostEqual(probs['Pick_Up'], 0.24)
+        self.assertAlmostEqual(probs['Hole'], 0.76)
+        self.assertEqual(model.absorption_probabilities('Hole'), {'Pick_Up': 0.0, 'Hole': 1.0})
+        self.assertAlmostEqual(model.calculate_expected_steps('Tee'), 1 + 0.7 * 2)
+        self.assertEqual(model.calculate_expected_steps('Pick_Up'), 0.0)
+        np.testing.assert_allclose(batch_absorption_probabilities(np.stack([P, P]), [2, 3])[1, 0], [0.24, 0.76])
+        with self.assertRaises(ValueError):
+            GolfHole(states, P, absorbing_states=['Green', 'Hole'])
+
+    def test_capped_expected_steps(self):
+        """Verify E[min(strokes, cap)] from the truncated stroke distribution."""
+        # P(1) = 0.2, P(2) = 0.4, P(>=3) = 0.4
+        self.assertAlmostEqual(self.model.capped_expected_steps('Tee', 1), 1.0)
+        self.assertAlmostEqual(self.model.capped_expected_steps('Tee', 2), 0.2 + 2 * 0.8)
+        self.assertAlmostEqual(self.model.capped_expected_steps('Tee', 3), 0.2 + 0.8 + 3 * 0.4)
+        self.assertAlmostEqual(self.model.capped_expected_steps('Tee', 200), 2.6, places=10)
+
+        # A pick-up always scores the cap; a penalty state adds strokes before capping
+        states = ['Tee', 'Penalty', 'Pick_Up', 'Hole']
+        P = np.array([
+            [0.5, 0.2, 0.1, 0.2],
+            [0.0, 1.0, 0.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0],
+            [0.0, 0.0, 0.0, 1.0]
+        ])
+        model = GolfHole(states, P, absorbing_states=['Penalty', 'Pick_Up', 'Hole'])
+        penalties = {'Penalty': 2, 'Pick_Up': np.inf}
+        # Absorbed at stroke k (prob 0.5^(k-1)) scores min(k + 2, 4) / 4 / k; still in play after 3 scores 4
+        expected = sum(0.5 ** (k - 1) * (0.2 * min(k + 2, 4) + 0.1 * 4 + 0.2 * k) for k in (1, 2, 3)) + 0.125 * 4
+        self.assertAlmostEqual(model.capped_expected_steps('Tee', 4, penalties), expected)
+
+        pick_up = np.array([[0.0, 0.7, 0.1, 0.2], [0.0, 0.5, 0.1, 0.4], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]])
+        with self.assertRaises(ValueError):  # One penalty for two absorbing states
+            batch_capped_expected_steps(pick_up[None], 0, 6, [2, 3], [np.inf])
+        with self.assertRaises(ValueError):  # Negative penalty
+            batch_capped_expected_steps(pick_up[None], 0, 6, [2, 3], [-5, 0])
+        with self.assertRaises(ValueError):
+            model.capped_expected_steps('Tee', 4, {'Penalty': -1})
+
+        caps = np.array([[1, 2, 3], [200, 3, 2]])
+        batched = batch_capped_expected_steps(np.broadcast_to(self.P, (2, 3, 3, 3)), 0, caps)
+        for idx in np.ndindex(caps.shape):
+            self.assertAlmostEqual(batched[idx], self.model.capped_expected_steps('Tee', int(caps[idx])), places=10)
+
     def test_simulation_vs_analytical(self):
         """Verify that simulation results converge to analytical results."""
         np.random.seed(42)
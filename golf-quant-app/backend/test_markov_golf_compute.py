@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+import threading
+import markov_golf_compute as compute
+from markov_golf_compute import STAT_KEYS, STATES, build_transition_matrix, expected_score, stats_key, submit_category_gains
+
+class TestGolfCompute(unittest.TestCase):
+    def setUp(self):
+        compute.clear_caches()
+        rng = np.random.default_rng(7)
+        self.pro = {k: float(v) for k, v in zip(STAT_KEYS, rng.uniform(0.05, 0.9, len(STAT_KEYS)))}
+        self.user = {k: float(v) for k, v in zip(STAT_KEYS, rng.uniform(0.05, 0.9, len(STAT_KEYS)))}
+
+    def test_compiled_template(self):
+        """Verify the compiled template produces a valid, normalized chain."""
+        P = build_transition_matrix(stats_key(self.user))
+        self.assertTrue(np.allclose(P.sum(axis=1), 1.0))
+        self.assertEqual(P[STATES.index('Hole'), STATES.index('Hole')], 1.0)
+        tee = STATES.index('Tee')
+        total = self.user['tee_fairway'] + self.user['tee_rough'] + self.user['tee_bunker']
+        self.assertAlmostEqual(P[tee, STATES.index('Fairway')], self.user['tee_fairway'] / total)
+
+    def test_score_cache_is_bounded(self):
+        """Verify repeated lookups hit the cache and eviction keeps it bounded."""
+        first = expected_score(self.user)
+        self.assertEqual(expected_score(dict(self.user)), first)
+        self.assertEqual(len(compute._score_cache), 1)
+
+        original_size = compute.SCORE_CACHE_SIZE
+        compute.SCORE_CACHE_SIZE = 3
+        try:
+            for i in range(5):
+                expected_score({**self.user, 'tee_fairway': 0.1 * (i + 1)})
+            self.assertEqual(len(compute._score_cache), 3)
+        finally:
+            compute.SCORE_CACHE_SIZE = original_size
+
+    def test_category_gains(self):
+        """Verify pooled category analysis matches replacing each category directly."""
+        cats = {'Tee': STAT_KEYS[:3], 'Putting': STAT_KEYS[-4:]}
+        futures = submit_category_gains(self.user, self.pro, cats)
+        self.assertEqual([name for name, _ in futures], list(cats))
+        user_score = expected_score(self.user)
+        for name, future in futures:
+            replaced = {**self.user, **{k: self.pro[k] for k in cats[name]}}
+            self.assertAlmostEqual(future.result(), user_score - expected_score(replaced), places=12)
+        for (_, first), (_, second) in zip(futures, submit_category_gains(self.user, self.pro, cats)):
+            self.assertIs(first, second)
+
+    def test_category_gains_with_degenerate_stats(self):
+        """Verify unsolvable stat vectors score 0.0 instead of failing the analysis."""
+        stuck_in_bunker = {**self.user, 'sand_bunker': 1.0, 'sand_green_short': 0.0, 'sand_green_lag': 0.0,
+                           'sand_fringe': 0.0, 'sand_rough': 0.0}
+        no_lag_putts = {**self.user, 'putt_lag_make': 0.0, 'putt_lag_to_tapin': 0.0, 'putt_lag_to_short': 0.0}
+        cats = {'Greenside Bunkers': [k for k in STAT_KEYS if k.startswith('sand_')],
+                'Putting': [k for k in STAT_KEYS if k.startswith('putt_')]}
+        for stats, broken in ((stuck_in_bunker, 'Greenside Bunkers'), (no_lag_putts, 'Putting')):
+            with self.assertRaises(Exception):
+                expected_score(stats)
+            gains = {name: f.result() for name, f in submit_category_gains(stats, self.pro, cats)}
+            # Both sides of the other category are unsolvable (0.0 - 0.0); fixing the broken one gives 0.0 - score
+            for name, gain in gains.items():
+                if name == broken:
+                    self.assertLess(gain, 0.0)
+                else:
+                    self.assertEqual(gain, 0.0)
+
+    def test_concurrent_sessions(self):
+        """Verify many sessions can share the cache concurrently."""
+        results = [None] * 10
+
+        def run(idx):
+            results[idx] = expected_score(self.pro)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(results)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
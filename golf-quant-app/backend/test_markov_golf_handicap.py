@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from markov_golf_handicap import (adjusted_gross_scores, expected_adjusted_gross, handicap_index,
+                                  handicap_index_from_history, net_double_bogey_caps, score_differentials)
+
+class TestHandicap(unittest.TestCase):
+    def setUp(self):
+        self.par = np.array([4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 3, 4, 5, 4, 4, 3, 4, 5])
+        self.stroke_index = np.arange(1, 19)
+
+    def test_net_double_bogey_caps(self):
+        """Verify handicap strokes are allocated by stroke index."""
+        caps = net_double_bogey_caps(self.par, self.stroke_index, [0, 5, 20])
+        np.testing.assert_array_equal(caps[0], self.par + 2)
+        np.testing.assert_array_equal(caps[1], self.par + 2 + (self.stroke_index <= 5))
+        np.testing.assert_array_equal(caps[2], self.par + 3 + (self.stroke_index <= 2))
+
+    def test_handicap_index(self):
+        """Verify the WHS lowest-differential table and rounding."""
+        differentials = np.arange(20, 0, -1, dtype=float)[None, :]
+        # Lowest 8 of 20 are 1..8
+        self.assertAlmostEqual(handicap_index(differentials)[0], 4.5)
+        # 3 rounds: lowest 1 minus 2.0
+        self.assertAlmostEqual(handicap_index(np.array([[10.0, 7.3, 12.0]]))[0], 5.3)
+        # Only the most recent 20 rounds count
+        self.assertAlmostEqual(handicap_index(np.hstack([[[0.0]], differentials]))[0], 4.5)
+        with self.assertRaises(ValueError):
+            handicap_index(np.array([[1.0, 2.0]]))
+
+    def test_score_differentials_are_rounded(self):
+        """Verify differentials are rounded to the nearest tenth."""
+        # 113 / 130 * (90 - 72.3) = 15.385 -> 15.4; 113 / 130 * (85 - 72.3) = 11.039 -> 11.0
+        np.testing.assert_allclose(score_differentials(np.array([90, 85]), 72.3, 130), [15.4, 11.0])
+
+    def test_history_matches_per_player(self):
+        """Verify the vectorized pass matches a per-player loop."""
+        rng = np.random.default_rng(0)
+        course_handicap = rng.integers(0, 36, 50)
+        scores = self.par + rng.poisson(2.0, (50, 20, 18))
+        caps = net_double_bogey_caps(self.par, self.stroke_index, course_handicap)
+        index = handicap_index_from_history(scores, caps, course_rating=71.2, slope=128)
+        for p in range(50):
+            ags = np.minimum(scores[p], caps[p]).sum(axis=1)
+            # Each differential is rounded to the nearest tenth before the lowest 8 are averaged
+            diffs = np.sort(np.floor(113 / 128 * (ags - 71.2) * 10 + 0.5) / 10)[:8]
+            self.assertAlmostEqual(index[p], np.floor(diffs.mean() * 10 + 0.5) / 10)
+        self.assertTrue(np.all(adjusted_gross_scores(scores, caps) <= scores.sum(axis=-1)))
+
+    def test_expected_adjusted_gross(self):
+        """Verify the model-based capped expectation sums per-hole caps."""
+        P = np.array([
+            [0.0, 0.8, 0.2],
+            [0.0, 0.5, 0.5],
+            [0.0, 0.0, 1.0]
+        ])
+        caps = np.array([[2] * 18, [200] * 18])
+        expected = expected_adjusted_gross(np.broadcast_to(P, (2, 18, 3, 3)), caps)
+        np.testing.assert_allclose(expected, [18 * 1.8, 18 * 2.6])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import numpy as np
+from markov_golf_engine import GolfHole
+from markov_golf_match_play import hole_outcomes, match_outcomes, match_play, match_play_batch, stroke_pmfs
+
+class TestMatchPlay(unittest.TestCase):
+    def setUp(self):
+        self.states = ['Tee', 'Green', 'Hole']
+        self.player_a = GolfHole(self.states, np.array([
+            [0.0, 0.8, 0.2],
+            [0.0, 0.5, 0.5],
+            [0.0, 0.0, 1.0]
+        ]))
+        self.player_b = GolfHole(self.states, np.array([
+            [0.0, 0.9, 0.1],
+            [0.0, 0.4, 0.6],
+            [0.0, 0.0, 1.0]
+        ]))
+
+    def _kronecker_hole_outcomes(self, a, b):
+        """Brute force: absorb the joint chain of both players into finished/lead states."""
+        P_a, P_b = a.transition_matrix, b.transition_matrix
+        n = P_a.shape[0]
+        joint = np.kron(P_a, P_b)
+        # Transient joint states: both still playing; absorbing: either player has holed out
+        transient = [i * n + j for i in range(n - 1) for j in range(n - 1)]
+        Q = joint[np.ix_(transient, transient)]
+        N = np.linalg.inv(np.identity(len(transient)) - Q)
+        hole = n - 1
+        win = joint[np.ix_(transient, [hole * n + j for j in range(n - 1)])].sum(axis=1)
+        halve = joint[transient, hole * n + hole]
+        lose = joint[np.ix_(transient, [i * n + hole for i in range(n - 1)])].sum(axis=1)
+        return np.array([(N @ win)[0], (N @ halve)[0], (N @ lose)[0]])
+
+    def test_hole_outcomes_match_kronecker(self):
+        """Verify the PMF-based per-hole odds equal the full product chain."""
+        pmfs = stroke_pmfs([self.player_a, self.player_b])
+        probs = hole_outcomes(pmfs[0], pmfs[1])
+        np.testing.assert_allclose(probs, self._kronecker_hole_outcomes(self.player_a, self.player_b), atol=1e-12)
+        self.assertAlmostEqual(probs.sum(), 1.0, places=10)
+
+    def test_match_outcomes(self):
+        """Verify the match DP on a one-hole match and on a symmetric match."""
+        hole = np.array([[0.5, 0.2, 0.3]])
+        np.testing.assert_allclose(match_outcomes(hole, holes=1), hole)
+        # Two holes: win = WW + WH + HW, halve = HH + WL + LW
+        w, h, l = 0.5, 0.2, 0.3
+        np.testing.assert_allclose(match_outcomes(hole, holes=2)[0],
+                                   [w * w + 2 * w * h, h * h + 2 * w * l, l * l + 2 * l * h])
+        sym = match_play(self.player_a, self.player_a)
+        self.assertAlmostEqual(sym['match_win'], sym['match_lose'], places=12)
+
+    def test_batch_matches_single(self):
+        """Verify batched pairings, including per-hole course models, agree with single calls."""
+        course = [self.player_a, self.player_b] * 9
+        pairings = [(self.player_a, self.player_b), (self.player_b, self.player_a), (course, self.player_b)]
+        hole_probs, match_probs = match_play_batch(pairings)
+        self.assertEqual(hole_probs.shape, (3, 18, 3))
+        for (a, b), probs, per_hole in zip(pairings, match_probs, hole_probs):
+            single = match_play(a, b)
+            np.testing.assert_allclose(probs, [single['match_win'], single['match_halve'], single['match_lose']])
+            np.testing.assert_allclose(per_hole, np.column_stack([single['hole_win'], single['hole_halve'], single['hole_lose']]))
+        np.testing.assert_allclose(match_probs.sum(axis=1), 1.0)
+        self.assertAlmostEqual(match_probs[0, 0], match_probs[1, 2], places=12)
+
+    def test_stacked_pmfs_match_per_model(self):
+        """Verify stacked PMFs, across mixed state layouts, equal each model's own distribution."""
+        pick_up = GolfHole(['Tee', 'Green', 'Pick_Up', 'Hole'], np.array([
+            [0.0, 0.7, 0.1, 0.2],
+            [0.0, 0.5, 0.1, 0.4],
+            [0.0, 0.0, 1.0, 0.0],
+            [0.0, 0.0, 0.0, 1.0]
+        ]), absorbing_states=['Pick_Up', 'Hole'])
+        models = [self.player_a, pick_up, self.player_b, self.player_a]
+        pmfs = stroke_pmfs(models, max_strokes=40)
+        for model, pmf in zip(models, pmfs):
+            np.testing.assert_allclose(pmf, model.stroke_distribution('Tee', 40), atol=1e-15)
+        np.testing.assert_array_equal(stroke_pmfs([self.player_a], 'Hole', 5)[0], [1, 0, 0, 0, 0, 0])
+
+    def test_truncated_tail_raises(self):
+        """Verify match odds refuse to drop mass where both players outlast the stroke cutoff."""
+        slow = GolfHole(self.states, np.array([
+            [0.0, 1.0, 0.0],
+            [0.0, 0.9, 0.1],
+            [0.0, 0.0, 1.0]
+        ]))
+        with self.assertRaises(ValueError):
+            match_play(slow, slow, max_strokes=20)
+        # Only one player with a tail: the other always finishes first, nothing is unresolved
+        probs = hole_outcomes(*stroke_pmfs([self.player_a, slow], max_strokes=200))
+        self.assertAlmostEqual(probs.sum(), 1.0, places=10)
+        self.assertGreater(match_play(slow, slow, max_strokes=400)['match_halve'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from markov_golf_engine import GolfHole
+from markov_golf_traces import TraceReader, write_traces
+
+class TestGolfTraces(unittest.TestCase):
+    def setUp(self):
+        self.states = ['Tee', 'Green', 'Hole']
+        self.P = np.array([
+            [0.0, 0.8, 0.2],
+            [0.0, 0.5, 0.5],
+            [0.0, 0.0, 1.0]
+        ])
+        self.model = GolfHole(self.states, self.P)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traces')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_trace_chunks(self):
+        """Verify chunked CSR traces are well formed and converge to the analytical mean."""
+        chunks = list(self.model.simulate_traces('Tee', 25_000, chunk_size=10_000, seed=1))
+        self.assertEqual([len(c.strokes) for c in chunks], [10_000, 10_000, 5_000])
+        for chunk in chunks:
+            self.assertEqual(chunk.states.dtype, np.uint8)
+            self.assertEqual(chunk.offsets[-1], len(chunk.states))
+            np.testing.assert_array_equal(np.diff(chunk.offsets) - 1, chunk.strokes)
+            np.testing.assert_array_equal(chunk.states[chunk.offsets[:-1]], 0)  # Tee
+            np.testing.assert_array_equal(chunk.states[chunk.offsets[1:] - 1], 2)  # Hole
+        strokes = np.concatenate([c.strokes for c in chunks])
+        self.assertAlmostEqual(strokes.mean(), 2.6, delta=0.05)
+
+    def test_write_and_read(self):
+        """Verify the on-disk store round-trips and is readable by plain np.load."""
+        chunks = list(self.model.simulate_traces('Green', 5_000, chunk_size=1_500, seed=2))
+        self.assertEqual(write_traces(self.path, iter(chunks), self.states), 5_000)
+
+        reader = TraceReader(self.path)
+        self.assertEqual(len(reader), 5_000)
+        np.testing.assert_array_equal(np.load(os.path.join(self.path, 'states.npy')),
+                                      np.concatenate([c.states for c in chunks]))
+        np.testing.assert_array_equal(reader.strokes, np.concatenate([c.strokes for c in chunks]))
+        self.assertEqual(reader.decode(reader.trace(0))[-1], 'Hole')
+        with open(os.path.join(self.path, 'offsets.npy'), 'rb') as f:
+            self.assertEqual(f.read(10), b'\x93NUMPY\x01\x00\x76\x00')  # Little-endian header length
+
+    def test_failed_write_leaves_no_store(self):
+        """Verify an export that fails mid-stream removes its partial columns and writes no metadata."""
+        def failing_chunks():
+            yield from self.model.simulate_traces('Tee', 1_000, chunk_size=400, seed=4)
+            raise RuntimeError("simulation interrupted")
+
+        write_traces(self.path, self.model.simulate_traces('Tee', 100, seed=5), self.states)
+        with self.assertRaises(RuntimeError):
+            write_traces(self.path, failing_chunks(), self.states)
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_reader_rejects_inconsistent_store(self):
+        """Verify the reader checks the CSR columns agree with each other."""
+        write_traces(self.path, self.model.simulate_traces('Tee', 500, seed=6), self.states)
+        strokes = np.load(os.path.join(self.path, 'strokes.npy'))
+        np.save(os.path.join(self.path, 'strokes.npy'), strokes[:-1])
+        with self.assertRaises(ValueError):
+            TraceReader(self.path)
+        np.save(os.path.join(self.path, 'strokes.npy'), strokes)
+        states = np.load(os.path.join(self.path, 'states.npy'))
+        np.save(os.path.join(self.path, 'states.npy'), states[:-1])
+        with self.assertRaises(ValueError):
+            TraceReader(self.path)
+
+    def test_filter(self):
+        """Verify streaming filters match a brute-force scan."""
+        write_traces(self.path, self.model.simulate_traces('Tee', 3_000, chunk_size=700, seed=3), self.states)
+        reader = TraceReader(self.path)
+        expected = [i for i in range(len(reader)) if reader.strokes[i] >= 4]
+        matched = list(reader.filter(start_state='Tee', min_strokes=4, chunk_size=256))
+        self.assertEqual([i for i, _ in matched], expected)
+        for i, codes in matched:
+            np.testing.assert_array_equal(codes, reader.trace(i))
+        self.assertEqual(list(reader.filter(start_state='Green')), [])
+        self.assertTrue(all(len(codes) == 3 for _, codes in reader.filter(strokes=2)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import asyncio
+import numpy as np
+from request_coalescer import BatchSolveError, RequestCoalescer, solve_expected_steps
+
+class TestRequestCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.P = np.array([
+            [0.0, 0.8, 0.2],
+            [0.0, 0.5, 0.5],
+            [0.0, 0.0, 1.0]
+        ])
+        self.batches = []
+
+    def _solve(self, items):
+        self.batches.append(len(items))
+        return solve_expected_steps(items)
+
+    def _gather(self, coalescer, items):
+        async def run():
+            return await asyncio.gather(*(coalescer.submit(item) for item in items), return_exceptions=True)
+        return asyncio.run(run())
+
+    def test_concurrent_requests_share_one_solve(self):
+        """Verify requests inside one window are flushed as a single batch."""
+        results = self._gather(RequestCoalescer(self._solve, window_ms=5.0, max_batch_size=100), [self.P] * 20)
+        self.assertEqual(self.batches, [20])
+        for res in results:
+            self.assertAlmostEqual(res, 2.6, places=10)
+
+    def test_max_batch_size_flushes_early(self):
+        """Verify a full batch is flushed without waiting for the window."""
+        self._gather(RequestCoalescer(self._solve, window_ms=1000.0, max_batch_size=8), [self.P] * 20)
+        self.assertEqual(self.batches, [8, 8, 4])
+
+    def test_bad_request_fails_alone(self):
+        """Verify an invalid matrix only fails its own waiter."""
+        items = [self.P, self.P * 0.5, self.P]
+        results = self._gather(RequestCoalescer(self._solve, window_ms=1.0), items)
+        self.assertAlmostEqual(results[0], 2.6, places=10)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertAlmostEqual(results[2], 2.6, places=10)
+
+    def test_short_result_fails_every_waiter(self):
+        """Verify a solver returning too few results fails all waiters instead of leaving some hanging."""
+        async def run():
+            coalescer = RequestCoalescer(lambda items: solve_expected_steps(items)[:-1], window_ms=1.0)
+            gathered = asyncio.gather(*(coalescer.submit(self.P) for _ in range(3)), return_exceptions=True)
+            return await asyncio.wait_for(gathered, timeout=5.0)
+        results = asyncio.run(run())
+        for res in results:
+            self.assertIsInstance(res, BatchSolveError)
+            self.assertIsInstance(res.__cause__, ValueError)
+
+    def test_batch_failure_is_wrapped_per_waiter(self):
+        """Verify a failed batch gives each waiter its own exception chained to the cause."""
+        cause = RuntimeError("solver crashed")
+
+        def fail(items):
+            raise cause
+        results = self._gather(RequestCoalescer(fail, window_ms=1.0), [self.P] * 3)
+        self.assertEqual(len({id(res) for res in results}), 3)
+        for res in results:
+            self.assertIsInstance(res, BatchSolveError)
+            self.assertIs(res.__cause__, cause)
+
+    def test_invalid_config(self):
+        """Test validation of the coalescer settings."""
+        with self.assertRaises(ValueError):
+            RequestCoalescer(self._solve, max_batch_size=0)
+
+if __name__ == '__main__':
+    unittest.main()